@@ -1,12 +1,26 @@
-import json
+import atexit
+import bisect
+import functools
+import hashlib
 import logging
+import math
 import os
 import sys
-from typing import Optional, List, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from typing import FrozenSet, NamedTuple, Optional, List, Tuple
 
+import orjson
 import requests
 import gspread
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.oauth2.service_account import Credentials
+from gspread.utils import absolute_range_name
+
+log = logging.getLogger("oanda_buyer")
 
 # ---------------------------------------------------------------------
 # Config & constants
@@ -20,18 +34,29 @@ ICON_MULTIPLIERS = {
     "📊": 2.0,
 }
 
-# Column indices (0-based) for the Oanda-Screener sheet
-COL_PAIR = 0        # A – Pair
-COL_PRICE = 1       # B – Price
-COL_PCT_DOWN = 2    # C – % down from ATH (stored as negative when below ATH)
-COL_LONG_MA = 10    # K – Long MA
-COL_ICON = 18       # S – Bullish icon
-COL_SENTIMENT = 20  # U – Sentiment (🟢 / 🔴 / ⚪ / ➖)
-
-# Bearish sentiment + icon columns
-# NOTE: sentiment is in the SAME column (U) as bullish, just different emoji
-COL_BEAR_SENTIMENT = COL_SENTIMENT  # uses 🔴 in column U
-COL_BEAR_ICON = 22                  # W – Bearish icon
+# Columns read from the Oanda-Screener sheet (row 1 is the header)
+COL_PAIR = "A"        # Pair
+COL_PRICE = "B"       # Price
+COL_PCT_DOWN = "C"    # % down from ATH (stored as negative when below ATH)
+COL_LONG_MA = "K"     # Long MA
+COL_ICON = "S"        # Bullish icon
+COL_SENTIMENT = "U"   # Sentiment (🟢 / 🔴 / ⚪ / ➖)
+
+# Bearish icon column
+# NOTE: bearish sentiment is in the SAME column (U) as bullish, just 🔴
+COL_BEAR_ICON = "W"   # Bearish icon
+
+# Order matters: it must match the field order of ScreenerRow
+SCREENER_COLUMNS = (
+    COL_PAIR,
+    COL_PRICE,
+    COL_PCT_DOWN,
+    COL_LONG_MA,
+    COL_ICON,
+    COL_SENTIMENT,
+    COL_BEAR_ICON,
+)
+FIRST_DATA_ROW = 2
 
 SENTIMENT_BUY = "🟢"
 SENTIMENT_SELL = "🔴"
@@ -45,15 +70,75 @@ BEAR_ICON_MULTIPLIERS = {
     "💣": 2.0,
 }
 
+# Smallest order notional worth placing; below this a candidate is skipped,
+# and a run whose buying power is below it cannot trade at all.
+MIN_NOTIONAL = 1.0
+
+# Order-size brackets by % down from ATH. Thresholds are inclusive upper
+# bounds (0–6, 7–12, 13–18, 19%+); each *_PCTS tuple has one more entry.
+BRACKET_THRESHOLDS = (6.0, 12.0, 18.0)
+BULL_BRACKET_PCTS = (0.05, 0.10, 0.15, 0.20)
+BEAR_BRACKET_PCTS = (0.20, 0.15, 0.10, 0.05)
+
 # Defaults for Google Sheets
 DEFAULT_SHEET_NAME = "Active-Investing"
 DEFAULT_WORKSHEET_NAME = "Oanda-Screener"
+GOOGLE_SCOPES = (
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+)
+
+# Optional on-disk cache of screener rows (set SCREENER_CACHE_PATH to enable).
+# Rows are reused while the spreadsheet's Drive modifiedTime is unchanged.
+# Formula recalculation (GOOGLEFINANCE, IMPORT*) does not bump modifiedTime,
+# so cached rows are also refused once older than SCREENER_CACHE_MAX_AGE
+# seconds; keep that short when prices come from live formulas.
+SCREENER_CACHE_PATH_ENV = "SCREENER_CACHE_PATH"
+SCREENER_CACHE_MAX_AGE_ENV = "SCREENER_CACHE_MAX_AGE"
+DEFAULT_SCREENER_CACHE_MAX_AGE = 300.0
+
+# Oanda HTTP settings: (connect, read) timeouts in seconds and retry policy.
+# Only idempotent GETs are retried on 5xx/429 -- a POSTed order that timed out
+# server-side may still have been filled, so it must never be resent blindly.
+OANDA_TIMEOUT = (3.05, 10)
+OANDA_RETRY = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+    raise_on_status=False,
+)
+
+# Upper bound on market orders in flight at once; the connection pool is
+# sized to match so every worker can hold its own keep-alive connection.
+MAX_ORDER_WORKERS = 8
+
+# Client-side cap on Oanda REST calls, shared by all worker threads
+OANDA_MAX_REQUESTS_PER_SEC = 30
+
+# Optional cache of the account summary / open positions for rapid re-runs,
+# held in memory for the life of the client and on disk across processes.
+# TTLs are in seconds; OANDA_CACHE_TTL sets both, the per-endpoint variables
+# override it, and 0 (the default) disables caching.
+DEFAULT_OANDA_CACHE_DIR = "/tmp/oanda_cache"
 
 # ---------------------------------------------------------------------
 # Utility functions
 # ---------------------------------------------------------------------
 
 
+def bracket_index(pct_from_ath: float) -> Optional[int]:
+    """
+    Index into BULL_BRACKET_PCTS / BEAR_BRACKET_PCTS for a % from ATH, or
+    None if the value is above ATH (or NaN). Both sides share the index.
+    """
+    if not pct_from_ath <= 0:
+        return None
+
+    # bisect_left keeps each threshold inside its own (lower) bracket
+    return bisect.bisect_left(BRACKET_THRESHOLDS, -pct_from_ath)
+
+
 def get_bracket_pct(pct_from_ath: float) -> Optional[float]:
     """
     Bullish bracket order size by % down from ATH.
@@ -69,24 +154,8 @@ def get_bracket_pct(pct_from_ath: float) -> Optional[float]:
 
     Anything above ATH (pct_from_ath > 0) is treated as invalid and returns None.
     """
-
-    # If we're above ATH, skip this row
-    if pct_from_ath > 0:
-        return None
-
-    # Use the magnitude of the drop from ATH
-    pct_down = abs(pct_from_ath)
-
-    if 0 <= pct_down <= 6:
-        return 0.05
-    if 6 < pct_down <= 12:
-        return 0.10
-    if 12 < pct_down <= 18:
-        return 0.15
-    if pct_down > 18:
-        return 0.20
-
-    return None
+    idx = bracket_index(pct_from_ath)
+    return None if idx is None else BULL_BRACKET_PCTS[idx]
 
 
 def get_bearish_bracket_pct(pct_from_ath: float) -> Optional[float]:
@@ -103,44 +172,67 @@ def get_bearish_bracket_pct(pct_from_ath: float) -> Optional[float]:
       13–18%     -> 10% of buying power
       19%+       -> 5% of buying power
     """
-
-    if pct_from_ath > 0:
-        return None
-
-    pct_down = abs(pct_from_ath)
-
-    if 0 <= pct_down <= 6:
-        return 0.20
-    if 6 < pct_down <= 12:
-        return 0.15
-    if 12 < pct_down <= 18:
-        return 0.10
-    if pct_down > 18:
-        return 0.05
-
-    return None
+    idx = bracket_index(pct_from_ath)
+    return None if idx is None else BEAR_BRACKET_PCTS[idx]
 
 
 def parse_float(value: str) -> Optional[float]:
     """Parse a float from a string that might have a '%' sign or be blank."""
     if value is None:
         return None
-    value = str(value).strip()
-    if not value:
-        return None
-    if value.endswith("%"):
-        value = value[:-1].strip()
+    value = str(value)
+    # Plain numeric strings are the common case; float() already ignores
+    # surrounding whitespace, so only fall back to trimming for '%' or blanks.
     try:
         return float(value)
+    except ValueError:
+        pass
+    value = value.strip()
+    if not value.endswith("%"):
+        return None
+    try:
+        return float(value[:-1])
     except ValueError:
         return None
 
 
+def env_flag(name: str) -> bool:
+    """True if the environment variable is set to 1/true/yes/on."""
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float from the environment, falling back to default if unset/invalid."""
+    value = parse_float(os.getenv(name))
+    if value is None:
+        if os.getenv(name):
+            log.warning("Ignoring invalid %s=%r; using %s.", name, os.getenv(name), default)
+        return default
+    return value
+
+
 # ---------------------------------------------------------------------
 # Oanda API client
 # ---------------------------------------------------------------------
 
 
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
 class OandaClient:
     def __init__(self):
         self.api_key = os.getenv("OANDA_API_KEY")
@@ -148,7 +240,7 @@ class OandaClient:
         env = os.getenv("OANDA_ENV", "practice").lower()
 
         if not self.api_key or not self.account_id:
-            logging.error("OANDA_API_KEY and OANDA_ACCOUNT_ID must be set.")
+            log.error("OANDA_API_KEY and OANDA_ACCOUNT_ID must be set.")
             sys.exit(1)
 
         if env == "live":
@@ -156,27 +248,108 @@ class OandaClient:
         else:
             self.base_url = "https://api-fxpractice.oanda.com"
 
+        # One pooled session for every call so keep-alive reuses the TLS
+        # connection instead of paying a fresh handshake per request.
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        })
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=2,
+                pool_maxsize=MAX_ORDER_WORKERS,
+                max_retries=OANDA_RETRY,
+            ),
+        )
+        self.rate_limiter = RateLimiter(OANDA_MAX_REQUESTS_PER_SEC)
+        atexit.register(self.close)
+
+        self.cache_dir = os.getenv("OANDA_CACHE_DIR", DEFAULT_OANDA_CACHE_DIR)
+        cache_ttl = env_float("OANDA_CACHE_TTL", 0.0)
+        self.summary_ttl = env_float("OANDA_SUMMARY_CACHE_TTL", cache_ttl)
+        self.positions_ttl = env_float("OANDA_POSITIONS_CACHE_TTL", cache_ttl)
+        # endpoint -> (monotonic expiry, data); checked before the disk copy
+        self._memory_cache = {}
+
+    def close(self):
+        """Release the pooled connections."""
+        self.session.close()
+
     def _request(self, method: str, path: str, **kwargs):
         url = f"{self.base_url}{path}"
-        headers = kwargs.pop("headers", {})
-        headers.setdefault("Authorization", f"Bearer {self.api_key}")
-        headers.setdefault("Content-Type", "application/json")
 
-        logging.debug("Oanda request %s %s", method, url)
-        resp = requests.request(method, url, headers=headers, **kwargs)
+        log.debug("Oanda request %s %s", method, url)
+        kwargs.setdefault("timeout", OANDA_TIMEOUT)
+        self.rate_limiter.wait()
+        resp = self.session.request(method, url, **kwargs)
 
         if not resp.ok:
-            logging.error("Oanda API error %s %s: %s",
-                          resp.status_code, resp.reason, resp.text)
+            log.error("Oanda API error %s %s: %s",
+                      resp.status_code, resp.reason, resp.text)
             resp.raise_for_status()
 
-        return resp.json()
+        return orjson.loads(resp.content)
+
+    def _cache_file(self, endpoint: str) -> str:
+        return os.path.join(self.cache_dir, f"{self.account_id}_{endpoint}.json")
+
+    def _cached_get(self, endpoint: str, ttl: float) -> dict:
+        """
+        GET /v3/accounts/{id}/{endpoint}, reusing the in-memory or on-disk
+        copy if it is younger than ttl seconds. Cache problems never fail
+        the request.
+        """
+        path = f"/v3/accounts/{self.account_id}/{endpoint}"
+        if ttl <= 0:
+            return self._request("GET", path)
+
+        entry = self._memory_cache.get(endpoint)
+        if entry is not None and time.monotonic() < entry[0]:
+            log.debug("Using in-memory Oanda %s.", endpoint)
+            return entry[1]
+
+        cache_file = self._cache_file(endpoint)
+        try:
+            with open(cache_file, "rb") as f:
+                cached = orjson.loads(f.read())
+            age = time.time() - cached["ts"]
+            if 0 <= age < ttl:
+                log.info("Using cached Oanda %s (%.1fs old).", endpoint, age)
+                self._memory_cache[endpoint] = (time.monotonic() + ttl - age, cached["data"])
+                return cached["data"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.warning("Ignoring unreadable Oanda cache %s: %s", cache_file, e)
+
+        data = self._request("GET", path)
+        self._memory_cache[endpoint] = (time.monotonic() + ttl, data)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_file, "wb") as f:
+                f.write(orjson.dumps({"ts": time.time(), "data": data}))
+        except OSError as e:
+            log.warning("Could not write Oanda cache %s: %s", cache_file, e)
+        return data
+
+    def invalidate_cache(self):
+        """Drop cached account state, e.g. after an order changed it."""
+        self._memory_cache.clear()
+        for endpoint in ("summary", "openPositions"):
+            try:
+                os.remove(self._cache_file(endpoint))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.warning("Could not remove Oanda cache for %s: %s", endpoint, e)
 
     def get_account_summary(self) -> dict:
-        return self._request("GET", f"/v3/accounts/{self.account_id}/summary")
+        return self._cached_get("summary", self.summary_ttl)
 
     def get_open_positions(self) -> list:
-        data = self._request("GET", f"/v3/accounts/{self.account_id}/openPositions")
+        data = self._cached_get("openPositions", self.positions_ttl)
         return data.get("positions", [])
 
     def create_market_order(self, instrument: str, units: int) -> dict:
@@ -199,13 +372,54 @@ class OandaClient:
             }
         }
 
-        logging.info("Submitting market order: instrument=%s units=%s",
-                     instrument, units)
-        return self._request(
-            "POST",
-            f"/v3/accounts/{self.account_id}/orders",
-            json=body,
-        )
+        log.info("Submitting market order: instrument=%s units=%s",
+                 instrument, units)
+        try:
+            return self._request(
+                "POST",
+                f"/v3/accounts/{self.account_id}/orders",
+                # Pre-encoded; the session already sends Content-Type: application/json
+                data=orjson.dumps(body),
+            )
+        finally:
+            # Even a failed POST may have filled; never reuse pre-order state
+            self.invalidate_cache()
+
+
+# Environment read by OandaClient.__init__; a change to any of them builds a new client
+OANDA_CONFIG_ENV = (
+    "OANDA_API_KEY",
+    "OANDA_ACCOUNT_ID",
+    "OANDA_ENV",
+    "OANDA_CACHE_DIR",
+    "OANDA_CACHE_TTL",
+    "OANDA_SUMMARY_CACHE_TTL",
+    "OANDA_POSITIONS_CACHE_TTL",
+)
+
+# sha256 of the OANDA_CONFIG_ENV values -> OandaClient (one entry)
+_oanda_client_cache = {}
+
+
+def get_oanda_client() -> OandaClient:
+    """
+    Return the Oanda client for the current configuration, so repeat runs in
+    one process reuse its pooled session. Keyed on a digest of the settings
+    (which include the API key), so a rotated key or changed account/env
+    builds a fresh client and closes the old one.
+    """
+    config = "\0".join(os.getenv(name, "") for name in OANDA_CONFIG_ENV)
+    digest = hashlib.sha256(config.encode()).hexdigest()
+    client = _oanda_client_cache.get(digest)
+    if client is not None:
+        return client
+
+    client = OandaClient()
+    for stale in _oanda_client_cache.values():
+        stale.close()
+    _oanda_client_cache.clear()
+    _oanda_client_cache[digest] = client
+    return client
 
 
 # ---------------------------------------------------------------------
@@ -213,43 +427,204 @@ class OandaClient:
 # ---------------------------------------------------------------------
 
 
-def get_gspread_client() -> gspread.Client:
-    creds_json = os.getenv("GOOGLE_CREDS_JSON")
-    if not creds_json:
-        logging.error("GOOGLE_CREDS_JSON env var must be set with service account JSON.")
-        sys.exit(1)
+class ScreenerRow(NamedTuple):
+    """One screener row, reduced to the cells the strategy reads."""
+    row_number: int
+    pair: str
+    price: str
+    pct_from_ath: str
+    long_ma: str
+    icon: str
+    sentiment: str
+    bear_icon: str
+
+
+# sha256 of the loaded service account JSON -> Credentials (one entry)
+_credentials_cache = {}
+
+
+def load_google_credentials() -> Credentials:
+    """
+    Return the service account credentials, loaded once per distinct key.
+    The object refreshes its own access token, so later callers skip the
+    JWT signing.
+
+    GOOGLE_CREDS_FILE (path to the service account JSON) takes precedence
+    over GOOGLE_CREDS_JSON (the JSON itself).
+    """
+    creds_file = os.getenv("GOOGLE_CREDS_FILE")
+    if creds_file:
+        source = "GOOGLE_CREDS_FILE"
+        try:
+            with open(creds_file, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            log.error("Could not load GOOGLE_CREDS_FILE %s: %s", creds_file, e)
+            sys.exit(1)
+    else:
+        source = "GOOGLE_CREDS_JSON"
+        creds_json = os.getenv("GOOGLE_CREDS_JSON")
+        if not creds_json:
+            log.error("GOOGLE_CREDS_FILE or GOOGLE_CREDS_JSON env var must be set with service account JSON.")
+            sys.exit(1)
+        raw = creds_json.encode()
+
+    # Key on a digest of the JSON actually read, so a rotated key (in the
+    # file or the env var) is picked up, without the cache holding a second
+    # copy of the private key as its key.
+    digest = hashlib.sha256(raw).hexdigest()
+    credentials = _credentials_cache.get(digest)
+    if credentials is not None:
+        return credentials
 
     try:
-        info = json.loads(creds_json)
-    except json.JSONDecodeError:
-        logging.error("GOOGLE_CREDS_JSON is not valid JSON.")
+        info = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        log.error("%s is not valid JSON.", source)
+        sys.exit(1)
+    try:
+        credentials = Credentials.from_service_account_info(info, scopes=GOOGLE_SCOPES)
+    except ValueError as e:
+        log.error("%s is not a valid service account key: %s", source, e)
         sys.exit(1)
 
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    credentials = Credentials.from_service_account_info(info, scopes=scopes)
+    _credentials_cache.clear()
+    _credentials_cache[digest] = credentials
+    return credentials
+
+
+def get_gspread_client() -> gspread.Client:
+    """Return the authorized gspread client for the current credentials."""
+    return _authorize_gspread(load_google_credentials())
+
+
+@functools.lru_cache(maxsize=1)
+def _authorize_gspread(credentials: Credentials) -> gspread.Client:
+    # Credentials compare by identity, so this rebuilds only after a reload
     return gspread.authorize(credentials)
 
 
-def fetch_screener_rows():
+@functools.lru_cache(maxsize=4)
+def open_spreadsheet(
+    client: gspread.Client, sheet_id: Optional[str], sheet_name: str
+) -> gspread.Spreadsheet:
+    """
+    Open the screener spreadsheet, memoized per client so repeat runs in one
+    process skip the metadata (and, by title, the Drive search) request.
+    """
+    if sheet_id:
+        # Opening by key skips the Drive files.list search by title
+        return client.open_by_key(sheet_id)
+    sheet = client.open(sheet_name)
+    log.info("Set GOOGLE_SHEET_ID=%s to skip the lookup by title.", sheet.id)
+    return sheet
+
+
+def load_cached_rows(
+    path: str, cache_key: str, revision: str, max_age: float
+) -> Optional[List[ScreenerRow]]:
+    """
+    Return the cached screener rows if the cache at `path` was written for the
+    same spreadsheet/worksheet and revision less than max_age seconds ago;
+    otherwise None.
+    """
+    try:
+        with open(path, "rb") as f:
+            cached = orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring unreadable screener cache %s: %s", path, e)
+        return None
+
+    if cached.get("key") != cache_key or cached.get("revision") != revision:
+        return None
+
+    try:
+        age = time.time() - cached["ts"]
+    except (KeyError, TypeError):
+        return None
+    if not 0 <= age < max_age:
+        log.info("Screener cache is %.0fs old (max %.0fs); refetching.", age, max_age)
+        return None
+
+    try:
+        return [ScreenerRow(*row) for row in cached["rows"]]
+    except (KeyError, TypeError):
+        log.warning("Ignoring malformed screener cache %s", path)
+        return None
+
+
+def store_cached_rows(path: str, cache_key: str, revision: str, rows: List[ScreenerRow]):
+    """Write screener rows to the cache; failures are logged, never fatal."""
+    try:
+        # orjson does not serialize tuple subclasses, so store plain lists
+        payload = {
+            "key": cache_key,
+            "revision": revision,
+            "ts": time.time(),
+            "rows": [list(row) for row in rows],
+        }
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(payload))
+    except OSError as e:
+        log.warning("Could not write screener cache %s: %s", path, e)
+
+
+def fetch_screener_rows() -> List[ScreenerRow]:
     sheet_name = os.getenv("GOOGLE_SHEET_NAME", DEFAULT_SHEET_NAME)
     worksheet_name = os.getenv("GOOGLE_WORKSHEET_NAME", DEFAULT_WORKSHEET_NAME)
 
-    client = get_gspread_client()
-    logging.info("Opening Google Sheet: %s / %s", sheet_name, worksheet_name)
-    sheet = client.open(sheet_name)
-    ws = sheet.worksheet(worksheet_name)
-
-    # get_all_values returns a list of rows, each row is a list of cell strings
-    rows = ws.get_all_values()
+    sheet_id = os.getenv("GOOGLE_SHEET_ID")
+
+    if sheet_id:
+        log.info("Opening Google Sheet by ID: %s / %s", sheet_id, worksheet_name)
+    else:
+        log.info("Opening Google Sheet: %s / %s", sheet_name, worksheet_name)
+    sheet = open_spreadsheet(get_gspread_client(), sheet_id, sheet_name)
+
+    cache_path = os.getenv(SCREENER_CACHE_PATH_ENV)
+    if cache_path:
+        cache_key = f"{sheet.id}:{worksheet_name}"
+        revision = sheet.get_lastUpdateTime()
+        max_age = env_float(SCREENER_CACHE_MAX_AGE_ENV, DEFAULT_SCREENER_CACHE_MAX_AGE)
+        rows = load_cached_rows(cache_path, cache_key, revision, max_age)
+        if rows is not None:
+            log.info("Screener unchanged since %s; using cached rows.", revision)
+            return rows
+
+    # Fetch only the columns we use (header row excluded) in a single
+    # values.batchGet. Sheet-qualified ranges mean we never need the
+    # Worksheet object, which would cost another metadata request.
+    ranges = [
+        absolute_range_name(worksheet_name, f"{col}{FIRST_DATA_ROW}:{col}")
+        for col in SCREENER_COLUMNS
+    ]
+    # COLUMNS major returns each range as one flat list, which is already
+    # the column layout we zip below; the fields mask drops the echoed
+    # range names and dimensions from the response.
+    value_ranges = sheet.values_batch_get(
+        ranges,
+        params={"majorDimension": "COLUMNS", "fields": "valueRanges.values"},
+    )["valueRanges"]
+
+    # The API trims trailing blanks (and omits "values" for an empty
+    # column), so columns can differ in length; zip_longest pads them.
+    columns = [vr.get("values", [[]])[0] for vr in value_ranges]
+    rows = [
+        ScreenerRow(row_number, *cells)
+        for row_number, cells in enumerate(
+            zip_longest(*columns, fillvalue=""), start=FIRST_DATA_ROW
+        )
+    ]
     if not rows:
-        logging.warning("No data found in sheet.")
+        log.warning("No data found in sheet.")
         return []
 
-    # Assume first row is header, skip it
-    return rows[1:]
+    if cache_path:
+        store_cached_rows(cache_path, cache_key, revision, rows)
+
+    return rows
 
 
 # ---------------------------------------------------------------------
@@ -267,48 +642,122 @@ def get_buying_power_from_summary(summary: dict) -> float:
         if key in account:
             try:
                 bp = float(account[key])
-                logging.info("Using %s as buying power: %s", key, bp)
+                log.info("Using %s as buying power: %s", key, bp)
                 return bp
             except (ValueError, TypeError):
                 continue
 
-    logging.error("Could not determine buying power from account summary.")
+    log.error("Could not determine buying power from account summary.")
     sys.exit(1)
 
 
-def get_open_instruments(positions: list) -> set:
+# Units strings Oanda reports for a flat side; matched before any float() parse
+FLAT_UNITS = frozenset(("0", "0.0", ""))
+
+
+def _has_units(units) -> bool:
+    """True if an Oanda units value is non-zero (unparseable counts as zero)."""
+    try:
+        # Inside the try: an unhashable value (e.g. {}) raises TypeError here
+        if units in FLAT_UNITS:
+            return False
+        return float(units) != 0
+    except (ValueError, TypeError):
+        return False
+
+
+def get_open_instruments(positions: list) -> FrozenSet[str]:
     """
-    Return a set of instrument names that currently have non-zero long or short units.
-    Used to skip candidates we already hold.
+    Return a frozenset of instrument names that currently have non-zero long or short units.
+    Used to skip candidates we already hold; frozen since it is read-only from here on.
     """
     instruments = set()
     for pos in positions:
         instrument = pos.get("instrument")
         long_units = pos.get("long", {}).get("units", "0")
         short_units = pos.get("short", {}).get("units", "0")
-        try:
-            long_units_f = float(long_units)
-        except (ValueError, TypeError):
-            long_units_f = 0.0
-        try:
-            short_units_f = float(short_units)
-        except (ValueError, TypeError):
-            short_units_f = 0.0
 
-        if (long_units_f != 0 or short_units_f != 0) and instrument:
+        if instrument and (_has_units(long_units) or _has_units(short_units)):
             instruments.add(instrument)
 
-    logging.info("Currently open instruments: %s", ", ".join(sorted(instruments)) or "none")
-    return instruments
+    # Only sort for the log line when it will actually be emitted
+    if log.isEnabledFor(logging.INFO):
+        log.info("Currently open instruments: %s", ", ".join(sorted(instruments)) or "none")
+    return frozenset(instruments)
+
+
+SIDE_LABELS = {"long": "bullish", "short": "bearish"}
+
+
+def size_side(
+    idx: int,
+    pair: str,
+    side: str,
+    price: float,
+    pct_from_ath: float,
+    long_ma: float,
+    icon: str,
+    icon_mult: float,
+    bracket_pct: float,
+    buying_power: float,
+    verbose: bool = False,
+) -> Optional[float]:
+    """
+    Size one side ("long" or "short") of a screener row, given that side's
+    bracket_pct.
+
+    Returns the notional clamped to buying_power and rounded to cents, or
+    None if the row does not qualify on that side.
+    """
+    label = SIDE_LABELS[side]
+    if side == "long":
+        ma_price_factor = long_ma / price  # larger when price < MA
+    else:
+        # Opposite of bullish: larger when price is ABOVE the long MA
+        ma_price_factor = price / long_ma
+
+    base_alloc = buying_power * bracket_pct
+    notional = base_alloc * icon_mult * ma_price_factor
+
+    if verbose:
+        log.info(
+            "Row %s %s (%s %s): price=%.5f pct_from_ath=%.2f "
+            "bracket_pct=%.3f icon=%s icon_mult=%.2f long_ma=%.5f "
+            "ma_price_factor=%.3f base_alloc=%.2f notional_raw=%.2f",
+            idx, pair, label, side, price, pct_from_ath, bracket_pct,
+            icon, icon_mult, long_ma, ma_price_factor,
+            base_alloc, notional
+        )
+
+    # Written as "not >=" so a NaN notional is rejected as well
+    if not notional >= MIN_NOTIONAL:
+        log.info(
+            "Row %s %s (%s): notional < %.2f (%.2f), skipping.",
+            idx, pair, label, MIN_NOTIONAL, notional
+        )
+        return None
+
+    if notional > buying_power:
+        log.info(
+            "Row %s %s (%s): notional %.2f exceeds buying power %.2f, clamping.",
+            idx, pair, label, notional, buying_power
+        )
+        notional = buying_power
+
+    notional = round(notional, 2)
+    if notional < MIN_NOTIONAL:
+        return None
+    return notional
 
 
 def choose_orders_from_rows(
-    rows,
+    rows: List[ScreenerRow],
     buying_power: float,
-    open_instruments: set,
-) -> List[Tuple[str, float, float, str]]:
+    open_instruments: FrozenSet[str],
+) -> List[Tuple[str, float, float, int]]:
     """
-    Scan rows and compute notional for valid candidates.
+    Scan rows and compute (pair, price, notional, units) for orders to place.
+    Units are signed: positive = long, negative = short.
 
     Bullish (long) side:
       - Column S icon in ICON_MULTIPLIERS
@@ -327,262 +776,230 @@ def choose_orders_from_rows(
     Shared rules:
       - Skip if the pair is already held in the account (open_instruments).
       - pct_from_ath must be <= 0 (below ATH); above ATH is skipped.
-      - If notional < 1.0, skip.
+      - If notional < MIN_NOTIONAL, skip.
       - Notional is clamped to buying_power.
+      - If the notional buys less than one whole unit, skip.
       - Avoid duplicate candidates for the same pair within a single run.
     """
-    candidates: List[Tuple[str, float, float, str]] = []
+    candidates: List[Tuple[str, float, float, int]] = []
     used_pairs = set()
 
-    for idx, row in enumerate(rows, start=2):  # start=2 because of header row
-        # Guard against short rows (including bearish columns)
-        if len(row) <= max(
-            COL_PAIR,
-            COL_PRICE,
-            COL_PCT_DOWN,
-            COL_LONG_MA,
-            COL_ICON,
-            COL_SENTIMENT,
-            COL_BEAR_ICON,
-            COL_BEAR_SENTIMENT,
-        ):
-            logging.debug("Row %s too short, skipping: %s", idx, row)
-            continue
-
-        pair = row[COL_PAIR].strip()
-        price_str = row[COL_PRICE]
-        pct_from_ath_str = row[COL_PCT_DOWN]
-        long_ma_str = row[COL_LONG_MA]
-
-        icon_bull = row[COL_ICON].strip()
-        sentiment_bull = row[COL_SENTIMENT].strip()
-
-        icon_bear = row[COL_BEAR_ICON].strip()
-        sentiment_bear = row[COL_BEAR_SENTIMENT].strip()
+    # The full per-row sizing breakdown is diagnostic detail; only emit it
+    # when asked so the common run does no formatting work for it.
+    verbose_rows = env_flag("VERBOSE_ROW_LOG") and log.isEnabledFor(logging.INFO)
+    # Most rows end in a DEBUG skip message; check the level once, not per call
+    debug_on = log.isEnabledFor(logging.DEBUG)
+
+    # Bound once so the per-row lookups are local-name calls
+    bull_multiplier = ICON_MULTIPLIERS.get
+    bear_multiplier = BEAR_ICON_MULTIPLIERS.get
+
+    for row in rows:
+        (idx, pair, price_str, pct_from_ath_str, long_ma_str,
+         icon_bull, sentiment_bull, icon_bear) = row
+        pair = pair.strip()
+        icon_bull = icon_bull.strip()
+        sentiment_bull = sentiment_bull.strip()
+        icon_bear = icon_bear.strip()
+        sentiment_bear = sentiment_bull  # same column (U), 🔴 for bearish
 
         # Skip empty or header-ish rows
         if not pair or pair.lower() == "pair":
             continue
 
+        # Most rows carry no signal at all; reject them on the cheap string
+        # checks before paying for any numeric parsing.
+        # A multiplier of None means that side has no signal on this row.
+        icon_mult = bull_multiplier(icon_bull) if sentiment_bull == SENTIMENT_BUY else None
+        icon_mult_bear = bear_multiplier(icon_bear) if sentiment_bear == SENTIMENT_SELL else None
+        if icon_mult is None and icon_mult_bear is None:
+            if debug_on:
+                log.debug(
+                    "Row %s %s: no bullish or bearish signal (sentiment=%r, icon=%r, bear_icon=%r).",
+                    idx, pair, sentiment_bull, icon_bull, icon_bear
+                )
+            continue
+
+        # Only rows that could trade need the held-position check
         if pair in open_instruments:
-            logging.info("Row %s %s: already held in account, skipping.", idx, pair)
+            log.info("Row %s %s: already held in account, skipping.", idx, pair)
             continue
 
+        # Parse each number only once the previous one proved valid
         price = parse_float(price_str)
-        pct_from_ath = parse_float(pct_from_ath_str)
-        long_ma = parse_float(long_ma_str)
-
         if price is None or price <= 0:
-            logging.debug("Row %s %s: invalid price '%s', skipping.",
+            if debug_on:
+                log.debug("Row %s %s: invalid price '%s', skipping.",
                           idx, pair, price_str)
             continue
 
+        long_ma = parse_float(long_ma_str)
         if long_ma is None or long_ma <= 0:
-            logging.debug("Row %s %s: invalid long MA '%s', skipping.",
+            if debug_on:
+                log.debug("Row %s %s: invalid long MA '%s', skipping.",
                           idx, pair, long_ma_str)
             continue
 
+        pct_from_ath = parse_float(pct_from_ath_str)
         if pct_from_ath is None:
-            logging.debug("Row %s %s: invalid pct_from_ath '%s', skipping.",
+            if debug_on:
+                log.debug("Row %s %s: invalid pct_from_ath '%s', skipping.",
                           idx, pair, pct_from_ath_str)
             continue
 
-        # -------------------------------------------------------------
-        # Bullish (long) logic
-        # -------------------------------------------------------------
-        if sentiment_bull == SENTIMENT_BUY and icon_bull in ICON_MULTIPLIERS:
-            bracket_pct = get_bracket_pct(pct_from_ath)
-            if bracket_pct is not None:
-                icon_mult = ICON_MULTIPLIERS[icon_bull]
-                ma_price_factor = long_ma / price  # larger when price < MA
-
-                base_alloc = buying_power * bracket_pct
-                notional = base_alloc * icon_mult * ma_price_factor
-
-                logging.info(
-                    "Row %s %s (bullish long): price=%.5f pct_from_ath=%.2f "
-                    "bracket_pct=%.3f icon=%s icon_mult=%.2f long_ma=%.5f "
-                    "ma_price_factor=%.3f base_alloc=%.2f notional_raw=%.2f",
-                    idx, pair, price, pct_from_ath, bracket_pct,
-                    icon_bull, icon_mult, long_ma, ma_price_factor,
-                    base_alloc, notional
-                )
-
-                if notional >= 1.0:
-                    if notional > buying_power:
-                        logging.info(
-                            "Row %s %s (bullish): notional %.2f exceeds buying power %.2f, clamping.",
-                            idx, pair, notional, buying_power
-                        )
-                        notional = buying_power
-
-                    notional = round(notional, 2)
-
-                    if notional >= 1.0:
-                        if pair in used_pairs:
-                            logging.info(
-                                "Row %s %s: already selected as candidate this run, "
-                                "skipping duplicate (bullish).",
-                                idx, pair
-                            )
-                        else:
-                            logging.info(
-                                "Candidate accepted (bullish long): row %s %s, price=%.5f, notional=%.2f",
-                                idx, pair, price, notional
-                            )
-                            candidates.append((pair, price, notional, "long"))
-                            used_pairs.add(pair)
-                else:
-                    logging.info(
-                        "Row %s %s (bullish): notional < 1.0 (%.2f), skipping.",
-                        idx, pair, notional
-                    )
-            else:
-                logging.debug(
-                    "Row %s %s (bullish): pct_from_ath %s outside valid brackets "
+        # One bracket lookup serves both sides; above ATH rules out both
+        bracket = bracket_index(pct_from_ath)
+        if bracket is None:
+            if debug_on:
+                log.debug(
+                    "Row %s %s: pct_from_ath %s outside valid brackets "
                     "(likely above ATH), skipping.",
                     idx, pair, pct_from_ath
                 )
-        else:
-            logging.debug(
-                "Row %s %s: bullish conditions not met (sentiment=%r, icon=%r).",
-                idx, pair, sentiment_bull, icon_bull
-            )
+            continue
 
-        # -------------------------------------------------------------
-        # Bearish (short) logic
-        # -------------------------------------------------------------
-        if sentiment_bear == SENTIMENT_SELL and icon_bear in BEAR_ICON_MULTIPLIERS:
-            bracket_pct_bear = get_bearish_bracket_pct(pct_from_ath)
-            if bracket_pct_bear is not None:
-                icon_mult_bear = BEAR_ICON_MULTIPLIERS[icon_bear]
-                # Opposite of bullish: larger when price is ABOVE the long MA
-                ma_price_factor_bear = price / long_ma
-
-                base_alloc_bear = buying_power * bracket_pct_bear
-                notional_bear = base_alloc_bear * icon_mult_bear * ma_price_factor_bear
-
-                logging.info(
-                    "Row %s %s (bearish short): price=%.5f pct_from_ath=%.2f "
-                    "bracket_pct=%.3f icon=%s icon_mult=%.2f long_ma=%.5f "
-                    "ma_price_factor=%.3f base_alloc=%.2f notional_raw=%.2f",
-                    idx, pair, price, pct_from_ath, bracket_pct_bear,
-                    icon_bear, icon_mult_bear, long_ma, ma_price_factor_bear,
-                    base_alloc_bear, notional_bear
-                )
+        # Column U holds a single sentiment, so at most one side has a signal
+        side = notional = None
+        if icon_mult is not None:
+            side = "long"
+            notional = size_side(idx, pair, side, price, pct_from_ath, long_ma,
+                                 icon_bull, icon_mult, BULL_BRACKET_PCTS[bracket],
+                                 buying_power, verbose_rows)
+        elif icon_mult_bear is not None:
+            side = "short"
+            notional = size_side(idx, pair, side, price, pct_from_ath, long_ma,
+                                 icon_bear, icon_mult_bear, BEAR_BRACKET_PCTS[bracket],
+                                 buying_power, verbose_rows)
+
+        if notional is None:
+            continue
 
-                if notional_bear >= 1.0:
-                    if notional_bear > buying_power:
-                        logging.info(
-                            "Row %s %s (bearish): notional %.2f exceeds buying power %.2f, clamping.",
-                            idx, pair, notional_bear, buying_power
-                        )
-                        notional_bear = buying_power
-
-                    notional_bear = round(notional_bear, 2)
-
-                    if notional_bear >= 1.0:
-                        if pair in used_pairs:
-                            logging.info(
-                                "Row %s %s: already selected as candidate this run, "
-                                "skipping duplicate (bearish).",
-                                idx, pair
-                            )
-                        else:
-                            logging.info(
-                                "Candidate accepted (bearish short): row %s %s, price=%.5f, notional=%.2f",
-                                idx, pair, price, notional_bear
-                            )
-                            candidates.append((pair, price, notional_bear, "short"))
-                            used_pairs.add(pair)
-                else:
-                    logging.info(
-                        "Row %s %s (bearish): notional < 1.0 (%.2f), skipping.",
-                        idx, pair, notional_bear
-                    )
-            else:
-                logging.debug(
-                    "Row %s %s (bearish): pct_from_ath %s outside valid brackets "
-                    "(likely above ATH), skipping.",
-                    idx, pair, pct_from_ath
-                )
-        else:
-            logging.debug(
-                "Row %s %s: bearish conditions not met (sentiment=%r, icon=%r).",
-                idx, pair, sentiment_bear, icon_bear
+        label = SIDE_LABELS[side]
+        if pair in used_pairs:
+            log.info(
+                "Row %s %s: already selected as candidate this run, "
+                "skipping duplicate (%s).",
+                idx, pair, label
+            )
+            continue
+
+        # Whole units only; a notional worth less than one unit cannot trade.
+        # A denormal price can overflow the ratio, which int() would raise on.
+        ratio = notional / price
+        if not (math.isfinite(ratio) and ratio >= 1.0):
+            log.info(
+                "Row %s %s (%s): no whole units to trade (price=%.5g, notional=%.2f), skipping.",
+                idx, pair, label, price, notional
             )
+            continue
+        units = math.floor(ratio)
+
+        # Bullish = long (positive units), Bearish = short (negative units)
+        if side == "short":
+            units = -units
 
-    logging.info("Total valid candidates this run: %d", len(candidates))
+        log.info(
+            "Candidate accepted (%s %s): row %s %s, price=%.5f, notional=%.2f, units=%s",
+            label, side, idx, pair, price, notional, units
+        )
+        candidates.append((pair, price, notional, units))
+        used_pairs.add(pair)
+
+    log.info("Total valid candidates this run: %d", len(candidates))
     return candidates
 
 
+def place_order(oanda: OandaClient, pair: str, price: float, notional: float, units: int) -> bool:
+    """Submit one market order; returns whether it filled. Failures are logged, never raised."""
+    try:
+        log.info(
+            "Placing market %s on %s: notional=%.2f, price=%.5f, units=%s",
+            "buy/long" if units > 0 else "sell/short",
+            pair, notional, price, units
+        )
+        resp = oanda.create_market_order(pair, units)
+
+        fill = resp.get("orderFillTransaction")
+        # The full pretty-printed response is only worth building for DEBUG
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Order response for %s: %s",
+                      pair, orjson.dumps(resp, option=orjson.OPT_INDENT_2).decode())
+
+        if fill:
+            log.info(
+                "Order placed successfully for %s: fill transaction %s, units=%s, price=%s",
+                pair, fill.get("id"), fill.get("units"), fill.get("price")
+            )
+        else:
+            # FOK orders that cannot fill come back 201 with a cancel transaction
+            cancel = resp.get("orderCancelTransaction", {})
+            log.warning("Order for %s was not filled: %s",
+                        pair, cancel.get("reason", "no fill transaction in response"))
+        return bool(fill)
+    except Exception as e:
+        # Other candidates still go ahead rather than failing the entire run
+        log.exception("Failed to place order for %s: %s", pair, e)
+        return False
+
+
 def main():
     logging.basicConfig(
         level=os.getenv("LOG_LEVEL", "INFO"),
         format="%(asctime)s [%(levelname)s] %(message)s",
     )
 
-    logging.info("Starting Oanda trading bot run (single pass).")
+    log.info("Starting Oanda trading bot run (single pass).")
 
     # -----------------------------------------------------------------
-    # Oanda: summary & open positions
+    # Oanda summary & open positions + Google Sheets screener rows
     # -----------------------------------------------------------------
-    oanda = OandaClient()
+    oanda = get_oanda_client()
+
+    # The three reads are independent blocking I/O, so run them side by
+    # side: the prelude then costs the slowest call rather than the sum.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        summary_future = executor.submit(oanda.get_account_summary)
+        positions_future = executor.submit(oanda.get_open_positions)
+        rows_future = executor.submit(fetch_screener_rows)
+
+        summary = summary_future.result()
+        positions = positions_future.result()
 
-    summary = oanda.get_account_summary()
-    positions = oanda.get_open_positions()
     open_instruments = get_open_instruments(positions)
 
     buying_power = get_buying_power_from_summary(summary)
-    if buying_power <= 0:
-        logging.info("Buying power is <= 0 (%.2f); no trades will be placed.", buying_power)
+    # No candidate can reach MIN_NOTIONAL once it is clamped to buying power
+    if buying_power < MIN_NOTIONAL:
+        log.info("Buying power %.2f is below the minimum order notional %.2f; "
+                 "no trades will be placed.", buying_power, MIN_NOTIONAL)
         return
 
-    # -----------------------------------------------------------------
-    # Google Sheets: read screener rows
-    # -----------------------------------------------------------------
-    rows = fetch_screener_rows()
+    # Only surface Sheets errors once we actually need the rows
+    rows = rows_future.result()
     if not rows:
-        logging.info("No screener rows to process.")
+        log.info("No screener rows to process.")
         return
 
     candidates = choose_orders_from_rows(rows, buying_power, open_instruments)
     if not candidates:
-        logging.info("No candidates met all criteria; ending run.")
+        log.info("No candidates met all criteria; ending run.")
         return
 
     # -----------------------------------------------------------------
     # Place orders for all candidates not already held
     # -----------------------------------------------------------------
-    for pair, price, notional, side in candidates:
-        units = int(notional / price)
-
-        if units <= 0:
-            logging.info(
-                "Calculated units <= 0 for pair %s (price=%.5f, notional=%.2f, side=%s), "
-                "no order will be placed.",
-                pair, price, notional, side,
-            )
-            continue
-
-        # Bullish = long (positive units), Bearish = short (negative units)
-        if side == "short":
-            units = -units
-
-        try:
-            logging.info(
-                "Placing market %s on %s: notional=%.2f, price=%.5f, units=%s",
-                "buy/long" if units > 0 else "sell/short",
-                pair, notional, price, units
-            )
-            resp = oanda.create_market_order(pair, units)
-            logging.info("Order placed successfully for %s: %s", pair, json.dumps(resp, indent=2))
-        except Exception as e:
-            logging.exception("Failed to place order for %s: %s", pair, e)
-            # Continue to next candidate rather than exiting entire run
-            continue
-
-    logging.info("Run complete. Exiting.")
+    # Each order is for a different instrument, so the POSTs are independent
+    # and their round trips can overlap.
+    workers = min(MAX_ORDER_WORKERS, len(candidates))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(place_order, oanda, pair, price, notional, units)
+            for pair, price, notional, units in candidates
+        ]
+    filled = sum(future.result() for future in futures)
+    log.info("Orders filled: %d of %d submitted.", filled, len(candidates))
+
+    log.info("Run complete. Exiting.")
 
 
 if __name__ == "__main__":